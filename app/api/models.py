@@ -28,7 +28,7 @@ class FileAnalysisRequest(BaseModel):
 
 class BatchAnalysisRequest(BaseModel):
     """Request model for batch analysis"""
-    texts: List[str] = Field(..., description="List of texts to analyze", min_items=1)
+    texts: List[str] = Field(..., description="List of texts to analyze", min_length=1)
     analysis_type: AnalysisType = Field(default=AnalysisType.COMPREHENSIVE, description="Type of analysis to perform")
 
 class AnalysisResponse(BaseModel):
@@ -0,0 +1,22 @@
+import json
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+
+class AnalysisJSONResponse(ORJSONResponse):
+    """ORJSONResponse that falls back to the standard json encoder
+
+    orjson refuses integers wider than 64 bits, which parsed JSON documents
+    can contain; those responses are rendered with json.dumps instead.
+    """
+
+    def render(self, content: Any) -> bytes:
+        try:
+            return super().render(content)
+        except TypeError:
+            return json.dumps(
+                jsonable_encoder(content),
+                ensure_ascii=False,
+                separators=(",", ":")
+            ).encode("utf-8")
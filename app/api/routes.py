@@ -1,10 +1,13 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Depends
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Response
 from fastapi.responses import JSONResponse
-from typing import List
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+import asyncio
+import io
 import json
 from loguru import logger
-from datetime import datetime
 
+from app.api.responses import AnalysisJSONResponse
 from app.api.models import (
     TextAnalysisRequest, 
     FileAnalysisRequest,
@@ -13,17 +16,77 @@ from app.api.models import (
     BatchAnalysisResponse,
     AnalysisType
 )
-from app.ml.analyzers import TextAnalyzer, SentimentAnalyzer, DataFormatAnalyzer
+from app.ml.analyzers import get_text_analyzer, get_sentiment_analyzer, get_data_format_analyzer
+from app.core.config import settings
+from app.utils.helpers import cached, cached_many, now_iso
 
 router = APIRouter()
 
-# Initialize analyzers
-text_analyzer = TextAnalyzer()
-sentiment_analyzer = SentimentAnalyzer()
-data_format_analyzer = DataFormatAnalyzer()
+# Shared analyzers
+text_analyzer = get_text_analyzer()
+sentiment_analyzer = get_sentiment_analyzer()
+data_format_analyzer = get_data_format_analyzer()
+
+# Cached results depend on the sentiment model, so keys are namespaced by it
+# to keep replicas running different models from sharing entries
+_MODEL_TAG = sentiment_analyzer.model_id
+
+# Analyzers are synchronous and CPU-bound, so they run in worker threads to
+# keep the event loop free. Sentiment model calls are serialized inside
+# SentimentAnalyzer, so the worker pool only parallelizes parsing and
+# statistics work.
+
+@cached(ttl=settings.CACHE_TTL, namespace=f"text:{_MODEL_TAG}")
+async def _analyze_text_content(analysis_type: str, text: str) -> dict:
+    """Run the analyzer matching analysis_type on text"""
+    if analysis_type == AnalysisType.SENTIMENT:
+        analyze = sentiment_analyzer.analyze
+    elif analysis_type == AnalysisType.TEXT:
+        analyze = text_analyzer.analyze
+    elif analysis_type == AnalysisType.DATA_FORMAT:
+        analyze = data_format_analyzer.analyze
+    else:  # COMPREHENSIVE
+        analyze = text_analyzer.analyze
+    return await asyncio.to_thread(analyze, text)
+
+@cached_many(ttl=settings.CACHE_TTL, namespace=f"text:{_MODEL_TAG}")
+async def _analyze_text_batch(analysis_type: str, texts: List[str]) -> list:
+    """Run the analyzer matching analysis_type on many texts at once
+    
+    Items are not fanned out across the worker pool: sentiment model calls
+    are serialized, so per-item threads would only queue on the model. One
+    batched call per request makes better use of it, while other requests
+    still run on the pool concurrently.
+    """
+    if analysis_type == AnalysisType.DATA_FORMAT:
+        # Plain text items among them share one batched sentiment call
+        items = [(text, "auto") for text in texts]
+        return await asyncio.to_thread(data_format_analyzer.analyze_many, items)
+    
+    # Model-backed analyses run as one batched call
+    return await asyncio.to_thread(_run_model_batch, analysis_type, texts)
+
+def _run_model_batch(analysis_type: str, texts: List[str]) -> list:
+    """Analyze many texts with one batched sentiment model call
+    
+    SentimentAnalyzer.analyze_many already falls back to per-item analysis
+    if the batched call fails.
+    """
+    analyzer = sentiment_analyzer if analysis_type == AnalysisType.SENTIMENT else text_analyzer
+    return analyzer.analyze_many(texts)
+
+@cached(ttl=settings.CACHE_TTL, namespace=f"file:{_MODEL_TAG}")
+async def _analyze_file_content(analysis_type: str, text: str, format_type: str) -> dict:
+    """Run the analyzer matching analysis_type on uploaded file content"""
+    if analysis_type == "sentiment":
+        return await asyncio.to_thread(sentiment_analyzer.analyze, text)
+    elif analysis_type == "data_format" or format_type != "auto":
+        return await asyncio.to_thread(data_format_analyzer.analyze, text, format_type)
+    else:  # comprehensive or text with auto-detected format
+        return await asyncio.to_thread(data_format_analyzer.analyze, text)
 
 @router.post("/analyze/text", response_model=AnalysisResponse)
-async def analyze_text(request: TextAnalysisRequest):
+async def analyze_text(request: TextAnalysisRequest, response: Response):
     """
     Analyze text data using specified analysis type
     
@@ -35,21 +98,15 @@ async def analyze_text(request: TextAnalysisRequest):
     try:
         logger.info(f"Received text analysis request: {request.analysis_type}")
         
-        if request.analysis_type == AnalysisType.SENTIMENT:
-            result = sentiment_analyzer.analyze(request.text)
-        elif request.analysis_type == AnalysisType.TEXT:
-            result = text_analyzer.analyze(request.text)
-        elif request.analysis_type == AnalysisType.DATA_FORMAT:
-            result = data_format_analyzer.analyze(request.text)
-        else:  # COMPREHENSIVE
-            result = text_analyzer.analyze(request.text)
+        result, cache_hit = await _analyze_text_content(request.analysis_type.value, request.text)
+        response.headers["x-cache"] = "hit" if cache_hit else "miss"
         
         return AnalysisResponse(
             success=True,
             analysis_type=request.analysis_type.value,
             data=result,
             metadata={
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso(),
                 "text_length": len(request.text)
             }
         )
@@ -60,6 +117,7 @@ async def analyze_text(request: TextAnalysisRequest):
 
 @router.post("/analyze/file", response_model=AnalysisResponse)
 async def analyze_file(
+    response: Response,
     file: UploadFile = File(...),
     format_type: str = "auto",
     analysis_type: str = "comprehensive"
@@ -75,39 +133,70 @@ async def analyze_file(
     try:
         logger.info(f"Received file analysis request: {file.filename}")
         
-        # Read file content
-        content = await file.read()
-        text_content = content.decode('utf-8')
+        # Reject oversized uploads before reading them
+        file_size = _upload_size(file)
+        if file_size > settings.MAX_UPLOAD_SIZE:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large: {file_size} bytes (limit {settings.MAX_UPLOAD_SIZE})"
+            )
+        
+        text_content = await asyncio.to_thread(_read_upload_text, file)
         
-        # Determine analysis type
-        if analysis_type == "sentiment":
-            result = sentiment_analyzer.analyze(text_content)
-        elif analysis_type == "data_format":
-            result = data_format_analyzer.analyze(text_content, format_type)
-        else:  # comprehensive or text
-            if format_type == "auto":
-                result = data_format_analyzer.analyze(text_content)
-            else:
-                result = data_format_analyzer.analyze(text_content, format_type)
+        result, cache_hit = await _analyze_file_content(analysis_type, text_content, format_type)
+        response.headers["x-cache"] = "hit" if cache_hit else "miss"
         
         return AnalysisResponse(
             success=True,
             analysis_type=analysis_type,
             data=result,
             metadata={
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso(),
                 "filename": file.filename,
-                "file_size": len(content),
+                "file_size": file_size,
                 "format_type": format_type
             }
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in file analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/analyze/batch", response_model=BatchAnalysisResponse)
-async def analyze_batch(request: BatchAnalysisRequest):
+def _upload_size(upload: UploadFile) -> int:
+    """Get the size in bytes of an uploaded file"""
+    if upload.size is not None:
+        return upload.size
+    size = upload.file.seek(0, io.SEEK_END)
+    upload.file.seek(0)
+    return size
+
+def _read_upload_text(upload: UploadFile) -> str:
+    """Decode an uploaded file as UTF-8 straight from its spooled buffer"""
+    upload.file.seek(0)
+    # newline='' keeps line endings exactly as uploaded
+    reader = io.TextIOWrapper(upload.file, encoding='utf-8', newline='')
+    try:
+        return reader.read()
+    finally:
+        # Detach so closing the wrapper doesn't close the upload
+        reader.detach()
+
+@dataclass(slots=True)
+class _AnalysisResult:
+    """Lightweight batch item with the same fields as AnalysisResponse"""
+    success: bool
+    analysis_type: str
+    data: Dict[str, Any]
+    metadata: Dict[str, Any]
+    error: Optional[str] = None
+
+# Batch results are generated here, so they are built as slotted dataclasses
+# that orjson serializes natively instead of being validated item by item
+# through AnalysisResponse. The response model is kept for the OpenAPI schema.
+@router.post("/analyze/batch", response_model=None, responses={200: {"model": BatchAnalysisResponse}})
+async def analyze_batch(request: BatchAnalysisRequest) -> AnalysisJSONResponse:
     """
     Perform batch analysis on multiple text items
     
@@ -117,56 +206,46 @@ async def analyze_batch(request: BatchAnalysisRequest):
     try:
         logger.info(f"Received batch analysis request for {len(request.texts)} items")
         
+        analysis_type = request.analysis_type.value
         results = []
         successful_count = 0
+        cache_hits = 0
+        
+        # Analyze each distinct text once, then fan results back out by position
+        unique_texts = list(dict.fromkeys(request.texts))
+        unique_outcomes = await _analyze_text_batch(analysis_type, unique_texts)
+        outcome_by_text = dict(zip(unique_texts, unique_outcomes))
+        outcomes = [outcome_by_text[text] for text in request.texts]
         
-        for i, text in enumerate(request.texts):
-            try:
-                if request.analysis_type == AnalysisType.SENTIMENT:
-                    analysis_result = sentiment_analyzer.analyze(text)
-                elif request.analysis_type == AnalysisType.TEXT:
-                    analysis_result = text_analyzer.analyze(text)
-                elif request.analysis_type == AnalysisType.DATA_FORMAT:
-                    analysis_result = data_format_analyzer.analyze(text)
-                else:  # COMPREHENSIVE
-                    analysis_result = text_analyzer.analyze(text)
-                
-                result = AnalysisResponse(
-                    success=True,
-                    analysis_type=request.analysis_type.value,
-                    data=analysis_result,
-                    metadata={"item_index": i, "text_length": len(text)}
-                )
-                results.append(result)
-                successful_count += 1
-                
-            except Exception as e:
-                logger.error(f"Error analyzing item {i}: {e}")
-                result = AnalysisResponse(
-                    success=False,
-                    analysis_type=request.analysis_type.value,
-                    data={},
-                    metadata={"item_index": i},
-                    error=str(e)
-                )
-                results.append(result)
+        for i, (text, (analysis_result, cache_hit)) in enumerate(zip(request.texts, outcomes)):
+            cache_hits += cache_hit
+            results.append(_AnalysisResult(
+                success=True,
+                analysis_type=analysis_type,
+                data=analysis_result,
+                metadata={"item_index": i, "text_length": len(text)}
+            ))
+            successful_count += 1
         
         # Calculate summary statistics
         summary = _calculate_batch_summary(results, request.analysis_type)
         
-        return BatchAnalysisResponse(
-            success=True,
-            total_items=len(request.texts),
-            successful_items=successful_count,
-            results=results,
-            summary=summary
+        return AnalysisJSONResponse(
+            {
+                "success": True,
+                "total_items": len(request.texts),
+                "successful_items": successful_count,
+                "results": results,
+                "summary": summary
+            },
+            headers={"x-cache": "hit" if cache_hits == len(request.texts) else "miss"}
         )
         
     except Exception as e:
         logger.error(f"Error in batch analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-def _calculate_batch_summary(results: List[AnalysisResponse], analysis_type: AnalysisType) -> dict:
+def _calculate_batch_summary(results: List[_AnalysisResult], analysis_type: AnalysisType) -> dict:
     """Calculate summary statistics for batch analysis"""
     successful_results = [r for r in results if r.success]
     
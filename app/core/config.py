@@ -1,4 +1,4 @@
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import List
 import os
 
@@ -11,6 +11,21 @@ class Settings(BaseSettings):
     # ML Model Configuration
     MODEL_TYPE: str = "sentiment_analysis"
     MODEL_CACHE_SIZE: int = 100
+    # Directory of the int8 ONNX sentiment model built by export_onnx.py;
+    # the PyTorch model is used when empty
+    SENTIMENT_ONNX_MODEL_DIR: str = ""
+    
+    # Worker threads used to run analyzers off the event loop
+    ANALYSIS_WORKERS: int = os.cpu_count() or 1
+    
+    # File Uploads (maximum size in bytes)
+    MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024
+    
+    # Result Cache (Redis); caching is disabled when REDIS_URL is empty
+    REDIS_URL: str = ""
+    CACHE_TTL: int = 3600
+    # Seconds to wait on Redis before skipping the cache
+    REDIS_SOCKET_TIMEOUT: float = 0.5
     
     # Logging
     LOG_LEVEL: str = "INFO"
@@ -19,7 +34,6 @@ class Settings(BaseSettings):
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8080"]
     
-    class Config:
-        env_file = ".env"
+    model_config = SettingsConfigDict(env_file=".env")
 
 settings = Settings()
\ No newline at end of file
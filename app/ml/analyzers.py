@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+import orjson
 import pandas as pd
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -12,6 +14,22 @@ except ImportError:
     TRANSFORMERS_AVAILABLE = False
     pipeline = None
 
+try:
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from transformers import AutoTokenizer
+    OPTIMUM_AVAILABLE = True
+except ImportError:
+    OPTIMUM_AVAILABLE = False
+    ORTModelForSequenceClassification = None
+    AutoTokenizer = None
+
+try:
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pacsv = None
+
 try:
     import nltk
     NLTK_AVAILABLE = True
@@ -20,7 +38,36 @@ except ImportError:
     nltk = None
 from loguru import logger
 import pickle
+import io
+import json
 import os
+import re
+import threading
+
+from app.core.config import settings
+
+# Hugging Face model used for sentiment analysis
+SENTIMENT_MODEL = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+
+# File written by export_onnx.py inside SENTIMENT_ONNX_MODEL_DIR
+ONNX_MODEL_FILE = "model_quantized.onnx"
+
+# Runs of digits long enough to overflow 64 bits, which orjson turns into floats
+_WIDE_INT_RE = re.compile(r'\d{19,}')
+
+def _loads_json(data: str) -> Any:
+    """Parse JSON with orjson, falling back to the standard library
+    
+    orjson rejects NaN, Infinity and out-of-range numbers such as 1e400, and
+    parses integers wider than 64 bits as floats; json.loads handles both
+    exactly.
+    """
+    if _WIDE_INT_RE.search(data):
+        return json.loads(data)
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return json.loads(data)
 
 class BaseAnalyzer(ABC):
     """Base class for all analyzers"""
@@ -33,15 +80,19 @@ class BaseAnalyzer(ABC):
 class SentimentAnalyzer(BaseAnalyzer):
     """Sentiment analysis using pre-trained transformers model"""
     
+    # Lexicon used by the basic fallback model
+    POSITIVE_WORDS = ['good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic']
+    NEGATIVE_WORDS = ['bad', 'terrible', 'awful', 'horrible', 'worst', 'hate']
+    
     def __init__(self):
+        # The shared pipeline is called from the analysis worker threads; its
+        # fast tokenizer is not thread-safe and each forward pass already uses
+        # every core, so model calls run one at a time
+        self._pipeline_lock = threading.Lock()
         if TRANSFORMERS_AVAILABLE:
             try:
                 # Initialize the sentiment analysis pipeline
-                self.sentiment_pipeline = pipeline(
-                    "sentiment-analysis",
-                    model="cardiffnlp/twitter-roberta-base-sentiment-latest",
-                    return_all_scores=True
-                )
+                self.sentiment_pipeline = self._load_pipeline()
                 logger.info("Sentiment analyzer initialized successfully")
             except Exception as e:
                 logger.warning(f"Failed to load transformer model: {e}")
@@ -53,6 +104,28 @@ class SentimentAnalyzer(BaseAnalyzer):
             self.sentiment_pipeline = None
             self._init_basic_model()
     
+    def _load_pipeline(self):
+        """Load the transformer pipeline, preferring the quantized ONNX model if configured"""
+        onnx_dir = settings.SENTIMENT_ONNX_MODEL_DIR
+        if onnx_dir:
+            if OPTIMUM_AVAILABLE:
+                logger.info(f"Loading quantized ONNX sentiment model from {onnx_dir}")
+                self.model_id = f"onnx-int8:{onnx_dir}"
+                return pipeline(
+                    "sentiment-analysis",
+                    model=ORTModelForSequenceClassification.from_pretrained(onnx_dir, file_name=ONNX_MODEL_FILE),
+                    tokenizer=AutoTokenizer.from_pretrained(onnx_dir),
+                    return_all_scores=True
+                )
+            logger.warning("optimum not available, loading the PyTorch sentiment model")
+        
+        self.model_id = SENTIMENT_MODEL
+        return pipeline(
+            "sentiment-analysis",
+            model=SENTIMENT_MODEL,
+            return_all_scores=True
+        )
+    
     def _init_basic_model(self):
         """Initialize basic sentiment model as fallback"""
         self.basic_model = Pipeline([
@@ -60,8 +133,19 @@ class SentimentAnalyzer(BaseAnalyzer):
             ('classifier', MultinomialNB())
         ])
         self.is_basic = True
+        # Identifies the model producing results, e.g. for cache keys
+        self.model_id = "basic"
+        
+        # Match each lexicon in a single pass over the text
+        self._positive_re = self._compile_lexicon(self.POSITIVE_WORDS)
+        self._negative_re = self._compile_lexicon(self.NEGATIVE_WORDS)
         logger.info("Basic sentiment model initialized as fallback")
     
+    @staticmethod
+    def _compile_lexicon(words: List[str]) -> re.Pattern:
+        """Compile a word list into one case-insensitive whole-word regex"""
+        return re.compile(r'\b(?:' + '|'.join(map(re.escape, words)) + r')\b', re.IGNORECASE)
+    
     def analyze(self, text: str) -> Dict[str, Any]:
         """Analyze sentiment of text"""
         try:
@@ -77,13 +161,30 @@ class SentimentAnalyzer(BaseAnalyzer):
                 "error": str(e)
             }
     
+    def analyze_many(self, texts: List[str], batch_size: int = 32) -> List[Dict[str, Any]]:
+        """Analyze sentiment of several texts with one batched model call"""
+        if not self.sentiment_pipeline:
+            return [self.analyze(text) for text in texts]
+        
+        try:
+            with self._pipeline_lock:
+                results = self.sentiment_pipeline(texts, batch_size=batch_size, truncation=True)
+            return [self._process_transformer_scores(scores) for scores in results]
+        except Exception as e:
+            logger.warning(f"Batched sentiment analysis failed, analyzing items individually: {e}")
+            return [self.analyze(text) for text in texts]
+    
     def _analyze_with_transformer(self, text: str) -> Dict[str, Any]:
         """Analyze using transformer model"""
-        results = self.sentiment_pipeline(text)
-        
-        # Process results
+        # Truncate like analyze_many so both paths give the same result for long texts
+        with self._pipeline_lock:
+            results = self.sentiment_pipeline(text, truncation=True)
+        return self._process_transformer_scores(results[0])
+    
+    def _process_transformer_scores(self, scores: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Convert the pipeline's per-label scores for one text into a result"""
         sentiment_scores = {}
-        for result in results[0]:
+        for result in scores:
             sentiment_scores[result['label'].lower()] = result['score']
         
         # Determine primary sentiment
@@ -101,12 +202,8 @@ class SentimentAnalyzer(BaseAnalyzer):
         """Analyze using basic model (mock implementation)"""
         # This is a simplified mock implementation
         word_count = len(text.split())
-        positive_words = ['good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic']
-        negative_words = ['bad', 'terrible', 'awful', 'horrible', 'worst', 'hate']
-        
-        text_lower = text.lower()
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
+        positive_count = len(self._positive_re.findall(text))
+        negative_count = len(self._negative_re.findall(text))
         
         if positive_count > negative_count:
             sentiment = "positive"
@@ -129,54 +226,60 @@ class TextAnalyzer(BaseAnalyzer):
     """Comprehensive text analysis"""
     
     def __init__(self):
-        self.sentiment_analyzer = SentimentAnalyzer()
-        if NLTK_AVAILABLE:
-            try:
-                nltk.download('punkt', quiet=True)
-                nltk.download('stopwords', quiet=True)
-            except:
-                logger.warning("Failed to download NLTK data")
-        else:
-            logger.info("NLTK not available, using basic text analysis")
+        self.sentiment_analyzer = get_sentiment_analyzer()
     
     def analyze(self, text: str) -> Dict[str, Any]:
         """Perform comprehensive text analysis"""
+        return self._build_analysis(text, self.sentiment_analyzer.analyze(text))
+    
+    def analyze_many(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Analyze several texts, running sentiment analysis as one batch"""
+        sentiment_results = self.sentiment_analyzer.analyze_many(texts)
+        return [
+            self._build_analysis(text, sentiment_result)
+            for text, sentiment_result in zip(texts, sentiment_results)
+        ]
+    
+    def _build_analysis(self, text: str, sentiment_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine text statistics with a precomputed sentiment result"""
+        # Split once and share the words with the statistics helpers
+        text_length = len(text)
+        words = text.split()
+        sentence_count = text.count('.') + 1
+        
         analysis = {
-            "text_length": len(text),
-            "word_count": len(text.split()),
-            "character_count": len(text),
-            "sentence_count": len(text.split('.')),
+            "text_length": text_length,
+            "word_count": len(words),
+            "character_count": text_length,
+            "sentence_count": sentence_count,
         }
         
         # Add sentiment analysis
-        sentiment_result = self.sentiment_analyzer.analyze(text)
         analysis.update(sentiment_result)
         
         # Add basic text statistics
-        analysis.update(self._get_text_statistics(text))
+        analysis.update(self._get_text_statistics(words, sentence_count))
         
         return analysis
     
-    def _get_text_statistics(self, text: str) -> Dict[str, Any]:
+    def _get_text_statistics(self, words: List[str], sentence_count: int) -> Dict[str, Any]:
         """Get basic text statistics"""
-        words = text.split()
+        # sum(map(len)) and set() already loop in C; NumPy equivalents are
+        # slower here because they must first convert the word list
+        avg_word_length = sum(map(len, words)) / len(words) if words else 0
         
         return {
-            "avg_word_length": sum(len(word) for word in words) / len(words) if words else 0,
+            "avg_word_length": avg_word_length,
             "unique_words": len(set(words)),
-            "readability_score": self._calculate_readability(text)
+            "readability_score": self._calculate_readability(len(words), sentence_count, avg_word_length)
         }
     
-    def _calculate_readability(self, text: str) -> float:
+    def _calculate_readability(self, word_count: int, sentence_count: int, avg_word_length: float) -> float:
         """Simple readability score calculation"""
-        words = text.split()
-        sentences = text.split('.')
-        
-        if not words or not sentences:
+        if not word_count or not sentence_count:
             return 0.0
         
-        avg_sentence_length = len(words) / len(sentences)
-        avg_word_length = sum(len(word) for word in words) / len(words)
+        avg_sentence_length = word_count / sentence_count
         
         # Simple readability formula
         readability = 206.835 - (1.015 * avg_sentence_length) - (84.6 * avg_word_length / 100)
@@ -185,25 +288,66 @@ class TextAnalyzer(BaseAnalyzer):
 class DataFormatAnalyzer(BaseAnalyzer):
     """Analyzer for different data formats"""
     
+    def __init__(self):
+        self._text_analyzer = get_text_analyzer()
+    
     def analyze(self, data: Any, format_type: str = "auto") -> Dict[str, Any]:
         """Analyze data based on format"""
         try:
-            if format_type == "csv" or (format_type == "auto" and self._is_csv(data)):
-                return self._analyze_csv(data)
-            elif format_type == "json" or (format_type == "auto" and self._is_json(data)):
-                return self._analyze_json(data)
-            else:
-                return self._analyze_text(data)
+            result = self._analyze_structured(data, format_type)
+            return result if result is not None else self._analyze_text(data)
         except Exception as e:
             logger.error(f"Error in data format analysis: {e}")
             return {"error": str(e), "format": "unknown"}
     
+    def analyze_many(self, items: List[Tuple[Any, str]]) -> List[Dict[str, Any]]:
+        """Analyze several (data, format_type) items, returning results in order"""
+        results: List[Dict[str, Any]] = [None] * len(items)
+        
+        # CSV and JSON have no batched parser and are analyzed one by one;
+        # plain text items are collected for one batched sentiment call
+        text_indices = []
+        for i, (data, format_type) in enumerate(items):
+            try:
+                results[i] = self._analyze_structured(data, format_type)
+            except Exception as e:
+                logger.error(f"Error in data format analysis: {e}")
+                results[i] = {"error": str(e), "format": "unknown"}
+                continue
+            if results[i] is None:
+                text_indices.append(i)
+        
+        if text_indices:
+            text_results = self._text_analyzer.analyze_many([items[i][0] for i in text_indices])
+            for i, result in zip(text_indices, text_results):
+                result["format"] = "text"
+                results[i] = result
+        
+        return results
+    
+    def _analyze_structured(self, data: Any, format_type: str) -> Optional[Dict[str, Any]]:
+        """Analyze data as CSV or JSON, or return None if it is plain text"""
+        if format_type == "csv" or (format_type == "auto" and self._is_csv(data)):
+            return self._analyze_csv(data)
+        if format_type == "json":
+            return self._analyze_json(data)
+        if format_type == "auto":
+            is_json, parsed = self._is_json(data)
+            if is_json:
+                return self._analyze_json(data, parsed)
+        return None
+    
     def _is_csv(self, data: str) -> bool:
         """Check if data appears to be CSV"""
-        lines = data.strip().split('\n')
-        if len(lines) < 2:
+        data = data.strip()
+        first_line, newline, _ = data.partition('\n')
+        
+        # Reject single-line and comma-free input before splitting every line
+        if not newline or ',' not in first_line:
             return False
         
+        lines = data.split('\n')
+        
         # Check if it has comma separation and consistent number of fields
         try:
             first_line_parts = lines[0].split(',')
@@ -220,22 +364,51 @@ class DataFormatAnalyzer(BaseAnalyzer):
         except:
             return False
     
-    def _is_json(self, data: str) -> bool:
-        """Check if data appears to be JSON"""
-        data = data.strip()
-        if not data:
-            return False
+    def _is_json(self, data: str) -> Tuple[bool, Any]:
+        """Check if data appears to be JSON, returning the parsed document"""
+        # Only objects and arrays are treated as JSON documents
+        if data.lstrip()[:1] not in ('{', '['):
+            return False, None
         try:
-            import json
-            json.loads(data)
-            return True
-        except:
-            return False
+            return True, _loads_json(data)
+        except (ValueError, RecursionError):
+            # Deeply nested input exhausts json.loads' recursion limit
+            return False, None
     
     def _analyze_csv(self, data: str) -> Dict[str, Any]:
         """Analyze CSV data"""
+        if PYARROW_AVAILABLE:
+            try:
+                return self._analyze_csv_with_arrow(data)
+            except Exception as e:
+                logger.debug(f"Arrow CSV parsing failed, falling back to pandas: {e}")
+        return self._analyze_csv_with_pandas(data)
+    
+    def _analyze_csv_with_arrow(self, data: str) -> Dict[str, Any]:
+        """Analyze CSV data with Arrow's CSV reader, without building a DataFrame"""
+        table = pacsv.read_csv(
+            io.BytesIO(data.encode('utf-8')),
+            read_options=pacsv.ReadOptions(block_size=1 << 20)
+        )
+        schema = table.schema
+        
+        # Duplicate headers would collapse into one key below; pandas renames
+        # them (a, a.1, ...) instead
+        if len(set(schema.names)) != table.num_columns:
+            raise ValueError("CSV has duplicate column names")
+        
+        return {
+            "format": "csv",
+            "rows": table.num_rows,
+            "columns": table.num_columns,
+            "column_names": schema.names,
+            "data_types": {field.name: str(field.type) for field in schema},
+            "sample_data": table.slice(0, 3).to_pylist()
+        }
+    
+    def _analyze_csv_with_pandas(self, data: str) -> Dict[str, Any]:
+        """Analyze CSV data with pandas"""
         try:
-            import io
             df = pd.read_csv(io.StringIO(data))
             
             # Convert data types to serializable format
@@ -257,11 +430,11 @@ class DataFormatAnalyzer(BaseAnalyzer):
         except Exception as e:
             return {"format": "csv", "error": str(e)}
     
-    def _analyze_json(self, data: str) -> Dict[str, Any]:
-        """Analyze JSON data"""
+    def _analyze_json(self, data: str, parsed: Any = None) -> Dict[str, Any]:
+        """Analyze JSON data, reusing an already parsed document if given"""
         try:
-            import json
-            parsed = json.loads(data)
+            if parsed is None:
+                parsed = _loads_json(data)
             return {
                 "format": "json",
                 "type": type(parsed).__name__,
@@ -274,7 +447,42 @@ class DataFormatAnalyzer(BaseAnalyzer):
     
     def _analyze_text(self, data: str) -> Dict[str, Any]:
         """Analyze plain text data"""
-        text_analyzer = TextAnalyzer()
-        result = text_analyzer.analyze(data)
+        result = self._text_analyzer.analyze(data)
         result["format"] = "text"
-        return result
\ No newline at end of file
+        return result
+
+# Shared analyzer instances. Constructing an analyzer loads the sentiment
+# model, so the service builds each one once and reuses it everywhere.
+
+@lru_cache(maxsize=None)
+def get_sentiment_analyzer() -> SentimentAnalyzer:
+    """Get the shared sentiment analyzer"""
+    return SentimentAnalyzer()
+
+@lru_cache(maxsize=None)
+def get_text_analyzer() -> TextAnalyzer:
+    """Get the shared text analyzer"""
+    return TextAnalyzer()
+
+@lru_cache(maxsize=None)
+def get_data_format_analyzer() -> DataFormatAnalyzer:
+    """Get the shared data format analyzer"""
+    return DataFormatAnalyzer()
+
+def warm_up() -> None:
+    """Prepare analyzers before serving requests
+
+    Downloads NLTK data and runs one inference so the first request doesn't
+    pay for model loading and lazy initialization.
+    """
+    if NLTK_AVAILABLE:
+        try:
+            nltk.download('punkt', quiet=True)
+            nltk.download('stopwords', quiet=True)
+        except Exception:
+            logger.warning("Failed to download NLTK data")
+    else:
+        logger.info("NLTK not available, using basic text analysis")
+    
+    get_text_analyzer().analyze("warmup")
+    logger.info("Analyzers warmed up")
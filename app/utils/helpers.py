@@ -1,9 +1,226 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
+from functools import lru_cache, wraps
+from datetime import datetime
+import asyncio
+import hashlib
 import json
 import csv
 import io
+import re
+import orjson
 from loguru import logger
 
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    aioredis = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = None
+    pacsv = None
+
+# Any character except alphanumerics, underscores, dots and hyphens
+_SANITIZE_RE = re.compile(r'[^\w\.-]')
+
+# Texts longer than this are never cached to bound Redis memory usage
+CACHE_MAX_TEXT_LENGTH = 100_000
+
+# Shared async Redis client, set up by the application lifespan
+_redis_client = None
+
+async def init_cache(redis_url: str, socket_timeout: float = 0.5) -> None:
+    """Connect the shared Redis client used by the analysis cache
+    
+    Connects and commands time out after socket_timeout seconds, so an
+    unresponsive Redis turns into cache misses instead of stalled requests.
+    """
+    global _redis_client
+    if not redis_url:
+        logger.info("REDIS_URL not set, analysis caching disabled")
+        return
+    if not REDIS_AVAILABLE:
+        logger.info("redis not available, analysis caching disabled")
+        return
+    try:
+        client = aioredis.from_url(
+            redis_url,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_timeout
+        )
+        await client.ping()
+        _redis_client = client
+        logger.info("Analysis cache connected to Redis")
+    except Exception as e:
+        logger.warning(f"Failed to connect to Redis, analysis caching disabled: {e}")
+
+async def close_cache() -> None:
+    """Close the shared Redis client"""
+    global _redis_client
+    if _redis_client is not None:
+        await _redis_client.close()
+        _redis_client = None
+
+def cache_key(namespace: str, analysis_type: str, text: str, *extra: Any) -> str:
+    """Build the cache key for an analysis of text"""
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    parts = [namespace, analysis_type, *(str(e) for e in extra), digest]
+    return "analysis:" + ":".join(parts)
+
+def _encode_result(result: Any) -> Optional[bytes]:
+    """Serialize an analysis result for caching, or None if it shouldn't be cached"""
+    # Don't cache failed analyses, they may succeed on retry
+    if not isinstance(result, dict) or "error" in result:
+        return None
+    try:
+        return orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY)
+    except orjson.JSONEncodeError as e:
+        logger.warning(f"Cannot cache analysis result: {e}")
+        return None
+
+async def _cache_get(key: str) -> Any:
+    """Fetch and decode a cached value, returning None on a miss"""
+    try:
+        cached_value = await _redis_client.get(key)
+        if cached_value is not None:
+            return orjson.loads(cached_value)
+    except Exception as e:
+        logger.warning(f"Cache lookup failed: {e}")
+    return None
+
+async def _cache_get_many(keys: List[str]) -> List[Any]:
+    """Fetch and decode several cached values with one MGET"""
+    if not keys:
+        return []
+    try:
+        cached_values = await _redis_client.mget(keys)
+        return [orjson.loads(value) if value is not None else None for value in cached_values]
+    except Exception as e:
+        logger.warning(f"Cache lookup failed: {e}")
+        return [None] * len(keys)
+
+async def _cache_set(key: str, ttl: int, result: Any) -> None:
+    """Store an analysis result unless it is a failure"""
+    value = _encode_result(result)
+    if value is None:
+        return
+    try:
+        await _redis_client.setex(key, ttl, value)
+    except Exception as e:
+        logger.warning(f"Cache store failed: {e}")
+
+async def _cache_set_many(ttl: int, items: List[Tuple[str, Any]]) -> None:
+    """Store several analysis results in one pipelined round trip"""
+    values = [(key, _encode_result(result)) for key, result in items]
+    values = [(key, value) for key, value in values if value is not None]
+    if not values:
+        return
+    try:
+        async with _redis_client.pipeline(transaction=False) as pipe:
+            for key, value in values:
+                pipe.setex(key, ttl, value)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Cache store failed: {e}")
+
+def cached(ttl: int = 3600, namespace: Optional[str] = None) -> Callable:
+    """Cache the result of an async analysis function in Redis.
+
+    The wrapped coroutine must take ``(analysis_type, text, *extra)`` and
+    return a JSON-serializable dict. The decorated coroutine returns a
+    ``(result, cache_hit)`` tuple so callers can report cache status.
+    """
+    def decorator(func: Callable[..., Awaitable[Dict[str, Any]]]) -> Callable[..., Awaitable[Tuple[Dict[str, Any], bool]]]:
+        key_namespace = namespace or func.__name__
+
+        @wraps(func)
+        async def wrapper(analysis_type: str, text: str, *extra: Any) -> Tuple[Dict[str, Any], bool]:
+            if _redis_client is None or len(text) > CACHE_MAX_TEXT_LENGTH:
+                return await func(analysis_type, text, *extra), False
+
+            key = cache_key(key_namespace, analysis_type, text, *extra)
+            cached_value = await _cache_get(key)
+            if cached_value is not None:
+                return cached_value, True
+
+            result = await func(analysis_type, text, *extra)
+            await _cache_set(key, ttl, result)
+            return result, False
+        return wrapper
+    return decorator
+
+def cached_many(ttl: int = 3600, namespace: Optional[str] = None) -> Callable:
+    """Batch counterpart of ``cached``.
+
+    The wrapped coroutine must take ``(analysis_type, texts)`` and return one
+    result per text; it is only called with the texts missing from the cache.
+    The decorated coroutine returns a list of ``(result, cache_hit)`` tuples
+    in input order. Use the same namespace as a ``cached`` function to share
+    its entries.
+    """
+    def decorator(func: Callable[..., Awaitable[List[Any]]]) -> Callable[..., Awaitable[List[Tuple[Any, bool]]]]:
+        key_namespace = namespace or func.__name__
+
+        @wraps(func)
+        async def wrapper(analysis_type: str, texts: List[str]) -> List[Tuple[Any, bool]]:
+            if _redis_client is None:
+                return [(result, False) for result in await func(analysis_type, texts)]
+
+            # Look up every cacheable text in one round trip
+            keys: Dict[int, str] = {
+                i: cache_key(key_namespace, analysis_type, text)
+                for i, text in enumerate(texts)
+                if len(text) <= CACHE_MAX_TEXT_LENGTH
+            }
+            cached_values = await _cache_get_many(list(keys.values()))
+
+            outcomes: List[Optional[Tuple[Any, bool]]] = [None] * len(texts)
+            for i, cached_value in zip(keys, cached_values):
+                if cached_value is not None:
+                    outcomes[i] = (cached_value, True)
+
+            # Analyze only the misses, then store their results together
+            misses = [i for i, outcome in enumerate(outcomes) if outcome is None]
+            if misses:
+                results = await func(analysis_type, [texts[i] for i in misses])
+                for i, result in zip(misses, results):
+                    outcomes[i] = (result, False)
+                await _cache_set_many(ttl, [
+                    (keys[i], outcomes[i][0]) for i in misses if i in keys
+                ])
+            return outcomes
+        return wrapper
+    return decorator
+
+# Current time at second granularity, refreshed by run_timestamp_clock()
+_now_iso: Optional[str] = None
+
+def now_iso() -> str:
+    """Get the current local time as an ISO 8601 string with second precision
+
+    Served from the value kept fresh by run_timestamp_clock(); computed
+    directly when the clock isn't running.
+    """
+    if _now_iso is not None:
+        return _now_iso
+    return datetime.now().isoformat(timespec='seconds')
+
+async def run_timestamp_clock(interval: float = 0.5) -> None:
+    """Refresh the cached timestamp until cancelled"""
+    global _now_iso
+    try:
+        while True:
+            _now_iso = datetime.now().isoformat(timespec='seconds')
+            await asyncio.sleep(interval)
+    finally:
+        _now_iso = None
+
 def format_response(success: bool, data: Any = None, error: str = None, metadata: Dict = None) -> Dict[str, Any]:
     """Format API response consistently"""
     response = {
@@ -34,6 +251,13 @@ def validate_text_input(text: str, min_length: int = 1, max_length: int = 10000)
 
 def parse_csv_content(content: str) -> List[Dict[str, Any]]:
     """Parse CSV content and return as list of dictionaries"""
+    # Arrow strips a UTF-8 BOM that csv.DictReader keeps in the first name
+    if PYARROW_AVAILABLE and not content.startswith('\ufeff'):
+        try:
+            return _parse_csv_with_arrow(content)
+        except Exception as e:
+            logger.debug(f"Arrow CSV parsing failed, falling back to csv module: {e}")
+    
     try:
         reader = csv.DictReader(io.StringIO(content))
         return list(reader)
@@ -41,6 +265,18 @@ def parse_csv_content(content: str) -> List[Dict[str, Any]]:
         logger.error(f"Error parsing CSV: {e}")
         return []
 
+def _parse_csv_with_arrow(content: str) -> List[Dict[str, Any]]:
+    """Parse CSV content with Arrow's CSV reader"""
+    data = content.encode('utf-8')
+    
+    # Read every column as text so values match csv.DictReader's output,
+    # using the column names as Arrow itself parses the header
+    with pacsv.open_csv(io.BytesIO(data)) as reader:
+        names = reader.schema.names
+    convert_options = pacsv.ConvertOptions(column_types={name: pa.string() for name in names})
+    table = pacsv.read_csv(io.BytesIO(data), convert_options=convert_options)
+    return table.to_pylist()
+
 def parse_json_content(content: str) -> Any:
     """Parse JSON content"""
     try:
@@ -51,28 +287,28 @@ def parse_json_content(content: str) -> Any:
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for safe storage"""
-    import re
-    # Remove any non-alphanumeric characters except dots, hyphens, and underscores
-    sanitized = re.sub(r'[^\w\.-]', '_', filename)
+    sanitized = _SANITIZE_RE.sub('_', filename)
     return sanitized[:100]  # Limit length
 
+@lru_cache(maxsize=1024)
 def get_file_extension(filename: str) -> str:
     """Get file extension from filename"""
     return filename.split('.')[-1].lower() if '.' in filename else ''
 
+# Relative complexity of each analysis type
+_COMPLEXITY_MULTIPLIERS = {
+    "sentiment": 1.0,
+    "text": 1.5,
+    "data_format": 0.8,
+    "comprehensive": 2.0
+}
+
+@lru_cache(maxsize=4096)
 def estimate_processing_time(text_length: int, analysis_type: str) -> float:
     """Estimate processing time based on text length and analysis type"""
     base_time = 0.1  # Base processing time in seconds
     
-    # Different analysis types have different complexity
-    complexity_multipliers = {
-        "sentiment": 1.0,
-        "text": 1.5,
-        "data_format": 0.8,
-        "comprehensive": 2.0
-    }
-    
-    multiplier = complexity_multipliers.get(analysis_type, 1.0)
+    multiplier = _COMPLEXITY_MULTIPLIERS.get(analysis_type, 1.0)
     
     # Estimate based on text length (rough approximation)
     time_per_char = 0.0001
@@ -0,0 +1,49 @@
+"""
+Export the sentiment model to ONNX and quantize it to int8.
+
+Dynamic int8 quantization makes CPU inference several times faster and the
+model about four times smaller. Requires optimum with ONNX Runtime:
+
+    pip install "optimum[onnxruntime]"
+    python export_onnx.py --output onnx_int8
+
+Then set SENTIMENT_ONNX_MODEL_DIR=onnx_int8 to serve the quantized model.
+"""
+import argparse
+
+from loguru import logger
+from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+from transformers import AutoTokenizer
+
+from app.ml.analyzers import SENTIMENT_MODEL
+
+# Quantization presets by target CPU instruction set
+QUANTIZATION_CONFIGS = {
+    "avx512_vnni": AutoQuantizationConfig.avx512_vnni,
+    "avx512": AutoQuantizationConfig.avx512,
+    "avx2": AutoQuantizationConfig.avx2,
+    "arm64": AutoQuantizationConfig.arm64,
+}
+
+def export(output_dir: str, arch: str) -> None:
+    """Export SENTIMENT_MODEL to ONNX and save an int8 quantized copy"""
+    logger.info(f"Exporting {SENTIMENT_MODEL} to ONNX")
+    model = ORTModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL, export=True)
+    tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_MODEL)
+    
+    logger.info(f"Quantizing to int8 for {arch}")
+    quantizer = ORTQuantizer.from_pretrained(model)
+    quantization_config = QUANTIZATION_CONFIGS[arch](is_static=False, per_channel=False)
+    quantizer.quantize(save_dir=output_dir, quantization_config=quantization_config)
+    tokenizer.save_pretrained(output_dir)
+    
+    logger.info(f"Quantized model saved to {output_dir}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="onnx_int8", help="Directory to write the quantized model to")
+    parser.add_argument("--arch", default="avx512_vnni", choices=QUANTIZATION_CONFIGS, help="Target CPU instruction set")
+    args = parser.parse_args()
+    
+    export(args.output, args.arch)
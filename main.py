@@ -3,13 +3,19 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
+from contextlib import asynccontextmanager, suppress
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import uvicorn
 import os
 from dotenv import load_dotenv
 from loguru import logger
 
 from app.api.routes import router as api_router
+from app.api.responses import AnalysisJSONResponse
 from app.core.config import settings
+from app.ml.analyzers import warm_up
+from app.utils.helpers import init_cache, close_cache, run_timestamp_clock
 
 # Load environment variables
 load_dotenv()
@@ -17,13 +23,37 @@ load_dotenv()
 # Configure logging
 logger.add("logs/app.log", rotation="10 MB", level=settings.LOG_LEVEL)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up and tear down shared resources"""
+    # Analyzer calls are offloaded with asyncio.to_thread, which runs them on
+    # the loop's default executor
+    app.state.executor = ThreadPoolExecutor(
+        max_workers=settings.ANALYSIS_WORKERS,
+        thread_name_prefix="analysis"
+    )
+    asyncio.get_running_loop().set_default_executor(app.state.executor)
+    
+    clock_task = asyncio.create_task(run_timestamp_clock())
+    await init_cache(settings.REDIS_URL, settings.REDIS_SOCKET_TIMEOUT)
+    await asyncio.to_thread(warm_up)
+    yield
+    clock_task.cancel()
+    # Let the clock task finish its cleanup before the loop goes away
+    with suppress(asyncio.CancelledError):
+        await clock_task
+    await close_cache()
+    app.state.executor.shutdown(wait=False)
+
 # Create FastAPI application
 app = FastAPI(
     title="AI/ML Feature Integration Service",
     description="A microservice that uses AI/ML models to analyze unstructured data",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=AnalysisJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
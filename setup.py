@@ -0,0 +1,35 @@
+"""
+Optional Cython build of the service's CPU-bound modules.
+
+The service runs unmodified from source; building the extensions in place
+makes Python import the compiled modules instead of the .py files:
+
+    pip install cython
+    python setup.py build_ext --inplace
+
+Pydantic models (app/api/models.py) are deliberately left out: their
+validation already runs in pydantic-core and Cython-compiled model
+classes lose the annotations Pydantic needs.
+
+Annotation typing is turned off so the compiled modules keep the source
+semantics: Cython would otherwise enforce annotations like ``text: str``
+and reject arguments the Python code accepts (e.g. str subclasses such as
+AnalysisType, or None).
+"""
+from setuptools import setup
+from Cython.Build import cythonize
+
+COMPILED_MODULES = [
+    "app/ml/analyzers.py",
+    "app/utils/helpers.py",
+]
+
+setup(
+    name="ai-ml-feature-integration-service",
+    packages=[],
+    ext_modules=cythonize(
+        COMPILED_MODULES,
+        language_level=3,
+        compiler_directives={"annotation_typing": False},
+    ),
+)
@@ -0,0 +1,49 @@
+import asyncio
+import httpx
+import pytest
+import pytest_asyncio
+from app.ml.analyzers import get_sentiment_analyzer, get_text_analyzer, get_data_format_analyzer
+
+# Analyzers load the sentiment model when constructed, so the suite shares
+# one instance of each (the same ones the API routes use).
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """One event loop for the whole session, so async fixtures can be shared"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest_asyncio.fixture(scope="session")
+async def aclient():
+    """Async test client for the FastAPI app, with its lifespan entered once
+    
+    Requests are driven through the ASGI app directly on the event loop,
+    without TestClient's thread hand-off.
+    """
+    from main import app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            yield c
+
+@pytest.fixture(scope="session")
+def sentiment_analyzer():
+    """Shared sentiment analyzer"""
+    return get_sentiment_analyzer()
+
+@pytest.fixture(scope="session")
+def text_analyzer():
+    """Shared text analyzer"""
+    return get_text_analyzer()
+
+@pytest.fixture(scope="session")
+def data_format_analyzer():
+    """Shared data format analyzer"""
+    return get_data_format_analyzer()
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_models(sentiment_analyzer):
+    """Run one inference up front so tests see steady-state model latency"""
+    sentiment_analyzer.analyze("warmup")
+    yield
@@ -1,104 +1,175 @@
+import asyncio
+import json
+import orjson
 import pytest
-from fastapi.testclient import TestClient
-from main import app
+from pydantic import ValidationError
+from app.api.models import TextAnalysisRequest
 
-client = TestClient(app)
+_JSON_HEADERS = {"content-type": "application/json"}
 
-def test_root_endpoint():
-    """Test the root endpoint"""
-    response = client.get("/")
-    assert response.status_code == 200
-    data = response.json()
+# Request bodies, encoded once for the whole module
+_SENTIMENT_PAYLOAD = orjson.dumps({
+    "text": "This is a great product! I love it.",
+    "analysis_type": "sentiment"
+})
+
+_TEXT_CASES_PAYLOAD = orjson.dumps({
+    "texts": [
+        "This is a great product! I love it.",
+        "This is a sample text for comprehensive analysis. It has multiple sentences.",
+        ""
+    ],
+    "analysis_type": "comprehensive"
+})
+
+_BATCH_SENTIMENT_PAYLOAD = orjson.dumps({
+    "texts": [
+        "This is great!",
+        "This is terrible.",
+        "This is neutral."
+    ],
+    "analysis_type": "sentiment"
+})
+
+_DUPLICATE_TEXTS_PAYLOAD = orjson.dumps({
+    "texts": ["This is great!", "This is terrible.", "This is great!"],
+    "analysis_type": "sentiment"
+})
+
+_DATA_FORMAT_PAYLOAD = orjson.dumps({
+    "texts": [
+        '{"name": "John"}',
+        "Just some plain text.",
+        "[1, 2, 3]"
+    ],
+    "analysis_type": "data_format"
+})
+
+@pytest.mark.asyncio
+async def test_readonly_endpoints_concurrent(aclient):
+    """Test the independent endpoints with concurrent requests"""
+    files = {"file": ("test.txt", "This is a test file content for analysis.", "text/plain")}
+    form = {"format_type": "text", "analysis_type": "sentiment"}
+    
+    root, health, model_info, file_analysis = await asyncio.gather(
+        aclient.get("/"),
+        aclient.get("/health"),
+        aclient.get("/api/v1/models/info"),
+        aclient.post("/api/v1/analyze/file", files=files, data=form)
+    )
+    
+    # Root endpoint
+    assert root.status_code == 200
+    data = orjson.loads(root.content)
     assert "service" in data
     assert data["service"] == "AI/ML Feature Integration Service"
     assert "version" in data
     assert "endpoints" in data
-
-def test_health_endpoint():
-    """Test the health check endpoint"""
-    response = client.get("/health")
-    assert response.status_code == 200
-    data = response.json()
+    
+    # Health check endpoint
+    assert health.status_code == 200
+    data = orjson.loads(health.content)
     assert data["status"] == "healthy"
     assert "timestamp" in data
+    
+    # Model info endpoint
+    assert model_info.status_code == 200
+    data = orjson.loads(model_info.content)
+    assert "available_models" in data
+    assert "supported_formats" in data
+    assert "analysis_types" in data
+    
+    # File analysis endpoint with text file
+    assert file_analysis.status_code == 200
+    result = orjson.loads(file_analysis.content)
+    assert result["success"] == True
+    assert "data" in result
+    assert result["metadata"]["filename"] == "test.txt"
 
-def test_text_analysis_endpoint():
+@pytest.mark.asyncio
+async def test_text_analysis_endpoint(aclient):
     """Test text analysis endpoint"""
-    test_data = {
-        "text": "This is a great product! I love it.",
-        "analysis_type": "sentiment"
-    }
-    
-    response = client.post("/api/v1/analyze/text", json=test_data)
+    response = await aclient.post("/api/v1/analyze/text", content=_SENTIMENT_PAYLOAD, headers=_JSON_HEADERS)
     assert response.status_code == 200
-    data = response.json()
+    data = orjson.loads(response.content)
     assert data["success"] == True
     assert "data" in data
     assert "sentiment" in data["data"]
+    assert response.headers["x-cache"] in ["hit", "miss"]
 
-def test_text_analysis_comprehensive():
-    """Test comprehensive text analysis"""
-    test_data = {
-        "text": "This is a sample text for comprehensive analysis. It has multiple sentences.",
-        "analysis_type": "comprehensive"
-    }
-    
-    response = client.post("/api/v1/analyze/text", json=test_data)
+@pytest.mark.asyncio
+async def test_text_analysis_cases_batched(aclient):
+    """Test comprehensive analysis of several texts in one batched call"""
+    response = await aclient.post("/api/v1/analyze/batch", content=_TEXT_CASES_PAYLOAD, headers=_JSON_HEADERS)
     assert response.status_code == 200
-    data = response.json()
-    assert data["success"] == True
-    assert "word_count" in data["data"]
-    assert "character_count" in data["data"]
-    assert "sentiment" in data["data"]
+    results = orjson.loads(response.content)["results"]
+    assert len(results) == 3
+    
+    positive, comprehensive, empty = results
+    assert positive["success"] == True
+    assert positive["data"]["sentiment"] in ["positive", "LABEL_2"]
+    
+    assert comprehensive["success"] == True
+    assert "word_count" in comprehensive["data"]
+    assert "character_count" in comprehensive["data"]
+    assert "sentiment" in comprehensive["data"]
+    
+    # Batch items aren't length-validated, so empty text yields empty statistics
+    assert empty["success"] == True
+    assert empty["data"]["word_count"] == 0
 
-def test_batch_analysis():
+@pytest.mark.asyncio
+async def test_batch_analysis(aclient):
     """Test batch analysis endpoint"""
-    test_data = {
-        "texts": [
-            "This is great!",
-            "This is terrible.",
-            "This is neutral."
-        ],
-        "analysis_type": "sentiment"
-    }
-    
-    response = client.post("/api/v1/analyze/batch", json=test_data)
+    response = await aclient.post("/api/v1/analyze/batch", content=_BATCH_SENTIMENT_PAYLOAD, headers=_JSON_HEADERS)
     assert response.status_code == 200
-    data = response.json()
+    data = orjson.loads(response.content)
     assert data["success"] == True
     assert data["total_items"] == 3
     assert len(data["results"]) == 3
+    assert [r["metadata"]["item_index"] for r in data["results"]] == [0, 1, 2]
     assert "summary" in data
 
-def test_model_info_endpoint():
-    """Test model info endpoint"""
-    response = client.get("/api/v1/models/info")
+@pytest.mark.asyncio
+async def test_batch_analysis_duplicate_texts(aclient):
+    """Test that duplicate texts in a batch each get their own result"""
+    response = await aclient.post("/api/v1/analyze/batch", content=_DUPLICATE_TEXTS_PAYLOAD, headers=_JSON_HEADERS)
     assert response.status_code == 200
-    data = response.json()
-    assert "available_models" in data
-    assert "supported_formats" in data
-    assert "analysis_types" in data
+    results = orjson.loads(response.content)["results"]
+    assert [r["metadata"]["item_index"] for r in results] == [0, 1, 2]
+    assert results[0]["data"] == results[2]["data"]
+    assert results[0]["data"] != results[1]["data"]
 
-def test_invalid_text_analysis():
-    """Test text analysis with invalid input"""
-    test_data = {
-        "text": "",  # Empty text should cause validation error
-        "analysis_type": "sentiment"
-    }
-    
-    response = client.post("/api/v1/analyze/text", json=test_data)
-    assert response.status_code == 422  # Validation error
+@pytest.mark.asyncio
+async def test_batch_data_format_analysis(aclient):
+    """Test that data format batches keep item order"""
+    response = await aclient.post("/api/v1/analyze/batch", content=_DATA_FORMAT_PAYLOAD, headers=_JSON_HEADERS)
+    assert response.status_code == 200
+    data = orjson.loads(response.content)
+    assert data["successful_items"] == 3
+    assert [r["data"]["format"] for r in data["results"]] == ["json", "text", "json"]
 
-def test_file_analysis_endpoint():
-    """Test file analysis endpoint with text file"""
-    test_content = "This is a test file content for analysis."
-    
-    files = {"file": ("test.txt", test_content, "text/plain")}
-    data = {"format_type": "text", "analysis_type": "sentiment"}
-    
-    response = client.post("/api/v1/analyze/file", files=files, data=data)
+@pytest.mark.asyncio
+async def test_data_format_keeps_wide_integers(aclient):
+    """Test that integers wider than 64 bits survive analysis and serialization"""
+    payload = {"text": '{"id": 123456789012345678901234567890}', "analysis_type": "data_format"}
+    response = await aclient.post("/api/v1/analyze/text", content=orjson.dumps(payload), headers=_JSON_HEADERS)
     assert response.status_code == 200
-    result = response.json()
-    assert result["success"] == True
-    assert "data" in result
-    assert result["metadata"]["filename"] == "test.txt"
\ No newline at end of file
+    # orjson would decode the integer as a float, so read it back with json
+    data = json.loads(response.content)
+    assert data["data"]["sample"] == {"id": 123456789012345678901234567890}
+
+def test_invalid_text_request_schema():
+    """Test that empty text fails request validation"""
+    with pytest.raises(ValidationError):
+        TextAnalysisRequest(text="", analysis_type="sentiment")
+
+@pytest.mark.asyncio
+async def test_file_analysis_too_large(aclient, monkeypatch):
+    """Test that uploads over the size limit are rejected"""
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE", 10)
+    
+    files = {"file": ("big.txt", "This file is longer than ten bytes.", "text/plain")}
+    response = await aclient.post("/api/v1/analyze/file", files=files)
+    assert response.status_code == 413
@@ -0,0 +1,146 @@
+import asyncio
+import pytest
+from app.utils import helpers
+from app.utils.helpers import cached, cached_many, cache_key, parse_csv_content
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the async Redis client"""
+    
+    def __init__(self):
+        self.store = {}
+    
+    async def get(self, key):
+        return self.store.get(key)
+    
+    async def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+    
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+    
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+class FakePipeline:
+    """Buffers commands and applies them to a FakeRedis on execute"""
+    
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    def setex(self, key, ttl, value):
+        self.commands.append((key, value))
+        return self
+    
+    async def execute(self):
+        for key, value in self.commands:
+            self.redis.store[key] = value
+        self.commands = []
+
+def test_init_cache_sets_socket_timeouts(monkeypatch):
+    """Test that the Redis client fails fast instead of waiting indefinitely"""
+    clients = []
+    
+    class PingableRedis(FakeRedis):
+        async def ping(self):
+            return True
+    
+    def from_url(url, **kwargs):
+        clients.append(kwargs)
+        return PingableRedis()
+    
+    monkeypatch.setattr(helpers.aioredis, "from_url", from_url)
+    monkeypatch.setattr(helpers, "_redis_client", None)
+    asyncio.run(helpers.init_cache("redis://cache:6379/0", socket_timeout=0.2))
+    
+    assert clients == [{"socket_timeout": 0.2, "socket_connect_timeout": 0.2}]
+    assert isinstance(helpers._redis_client, PingableRedis)
+
+def test_cached_hit_and_miss(monkeypatch):
+    """Test that analysis results are served from the cache on repeat calls"""
+    fake = FakeRedis()
+    monkeypatch.setattr(helpers, "_redis_client", fake)
+    calls = []
+    
+    @cached(ttl=60)
+    async def analyze(analysis_type, text):
+        calls.append(text)
+        return {"word_count": len(text.split())}
+    
+    result, hit = asyncio.run(analyze("text", "hello world"))
+    assert result == {"word_count": 2}
+    assert hit is False
+    
+    result, hit = asyncio.run(analyze("text", "hello world"))
+    assert result == {"word_count": 2}
+    assert hit is True
+    assert calls == ["hello world"]
+    assert cache_key("analyze", "text", "hello world") in fake.store
+
+def test_cached_skips_errors_and_long_texts(monkeypatch):
+    """Test that failed analyses and oversized texts are not cached"""
+    fake = FakeRedis()
+    monkeypatch.setattr(helpers, "_redis_client", fake)
+    
+    @cached(ttl=60)
+    async def analyze(analysis_type, text):
+        return {"error": "boom"} if text == "bad" else {"ok": True}
+    
+    asyncio.run(analyze("text", "bad"))
+    asyncio.run(analyze("text", "x" * (helpers.CACHE_MAX_TEXT_LENGTH + 1)))
+    assert fake.store == {}
+
+def test_cached_many_only_analyzes_misses(monkeypatch):
+    """Test that batch caching shares entries and only analyzes cache misses"""
+    fake = FakeRedis()
+    monkeypatch.setattr(helpers, "_redis_client", fake)
+    batches = []
+    
+    @cached(ttl=60, namespace="words")
+    async def analyze(analysis_type, text):
+        return {"word_count": len(text.split())}
+    
+    @cached_many(ttl=60, namespace="words")
+    async def analyze_many(analysis_type, texts):
+        batches.append(texts)
+        return [{"word_count": len(text.split())} for text in texts]
+    
+    asyncio.run(analyze("text", "one two"))
+    outcomes = asyncio.run(analyze_many("text", ["a", "one two", "b c d"]))
+    assert outcomes == [({"word_count": 1}, False), ({"word_count": 2}, True), ({"word_count": 3}, False)]
+    assert batches == [["a", "b c d"]]
+    
+    outcomes = asyncio.run(analyze_many("text", ["a", "b c d"]))
+    assert all(hit for _, hit in outcomes)
+    assert len(batches) == 1
+
+def test_timestamp_clock():
+    """Test that the cached timestamp is served while the clock runs"""
+    async def run():
+        clock = asyncio.create_task(helpers.run_timestamp_clock(interval=0.01))
+        await asyncio.sleep(0.02)
+        assert helpers.now_iso() == helpers._now_iso
+        clock.cancel()
+        await asyncio.gather(clock, return_exceptions=True)
+    
+    asyncio.run(run())
+    assert helpers._now_iso is None
+    assert len(helpers.now_iso()) == len("2024-01-01T00:00:00")
+
+def test_parse_csv_content():
+    """Test CSV parsing keeps values as strings, including ragged rows"""
+    rows = parse_csv_content('name,age\nJohn,25\n"Doe, Jane",\n')
+    assert rows == [{"name": "John", "age": "25"}, {"name": "Doe, Jane", "age": ""}]
+    
+    rows = parse_csv_content("a,b\n1,2,3\n")
+    assert rows == [{"a": "1", "b": "2", None: ["3"]}]
+    
+    # Header quirks: a byte order mark and a quoted name spanning lines
+    assert parse_csv_content("\ufeffa,b\n1,2") == [{"\ufeffa": "1", "b": "2"}]
+    assert parse_csv_content('"x\ny",b\n1,2') == [{"x\ny": "1", "b": "2"}]